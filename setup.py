@@ -53,6 +53,7 @@ setup(
         "notebook_runner": ["IPython>=8.11", "nbformat>=5.0", "regex>=2020.6"],
         "azure": ["azure-storage-blob>=12.16.0", "azure-identity>=1.12.0"],
         "open_data": ["pandas>=2.1.4", "jsonlines>=4.0.0"],
+        "compression": ["zstandard>=0.15.0", "lz4>=3.1.0"],
         "testing": [
             "pytest",
             "pytest-cov",
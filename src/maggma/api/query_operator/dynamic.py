@@ -1,6 +1,7 @@
 import inspect
 from abc import abstractmethod
-from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union
+from functools import lru_cache
+from typing import Any, Callable, ClassVar, Dict, List, Optional, Tuple, Type
 
 from fastapi.params import Query
 from monty.json import MontyDecoder
@@ -11,10 +12,19 @@ from maggma.api.query_operator import QueryOperator
 from maggma.api.utils import STORE_PARAMS
 from maggma.utils import dynamic_import
 
+# Field annotations each operator generates query parameters for
+NUMERIC_TYPES = frozenset({int, float, Optional[int], Optional[float]})
+INTEGER_TYPES = frozenset({int, Optional[int]})
+STRING_TYPES = frozenset({str, Optional[str]})
+
 
 class DynamicQueryOperator(QueryOperator):
     """Abstract Base class for dynamic query operators."""
 
+    # Operators only depend on the operator class and the model fields, so they are
+    # built once and shared between instances, e.g. across resources for the same model
+    _operator_cache: ClassVar[Dict[Tuple, Tuple[List, inspect.Signature]]] = {}
+
     def __init__(
         self,
         model: Type[BaseModel],
@@ -28,30 +38,42 @@ class DynamicQueryOperator(QueryOperator):
         all_fields: Dict[str, FieldInfo] = model.model_fields
         param_fields = fields or list(set(all_fields.keys()) - set(excluded_fields or []))
 
-        # Convert the fields into operator tuples
-        ops = [
-            op
-            for name, field in all_fields.items()
-            if name in param_fields
-            for op in self.field_to_operator(name, field)
-        ]
+        # Annotations are part of the key since api_sanitize rewrites model fields in place
+        cache_key = (
+            type(self),
+            model,
+            tuple((name, field.annotation) for name, field in all_fields.items() if name in param_fields),
+        )
+        try:
+            ops, query_signature = self._operator_cache[cache_key]
+        except KeyError:
+            ops, query_signature = self._build_operators(all_fields, param_fields)
+            self._operator_cache[cache_key] = (ops, query_signature)
+        except TypeError:
+            # unhashable annotation, skip the cache
+            ops, query_signature = self._build_operators(all_fields, param_fields)
 
         # Dictionary to make converting the API query names to function that generates
         # Maggma criteria dictionaries
         self.mapping = {op[0]: op[3] for op in ops}
 
+        # Requests tend to repeat the same combination of query parameters, so the
+        # criteria builders are looked up once per combination
+        @lru_cache(maxsize=1024)
+        def query_plan(keys: Tuple[str, ...]) -> Tuple[Callable[..., Dict], ...]:
+            try:
+                return tuple(self.mapping[k] for k in keys)
+            except KeyError as e:
+                raise KeyError(f"Cannot find key {e.args[0]} in current query to database mapping")
+
+        self._query_plan = query_plan
+
         def query(**kwargs) -> STORE_PARAMS:
-            criteria = []
-            for k, v in kwargs.items():
-                if v is not None:
-                    try:
-                        criteria.append(self.mapping[k](v))
-                    except KeyError:
-                        raise KeyError(f"Cannot find key {k} in current query to database mapping")
-
-            final_crit = {}
-            for entry in criteria:
-                for key, value in entry.items():
+            keys = tuple(k for k, v in kwargs.items() if v is not None)
+
+            final_crit: Dict = {}
+            for k, builder in zip(keys, query_plan(keys)):
+                for key, value in builder(kwargs[k]).items():
                     if key not in final_crit:
                         final_crit[key] = value
                     else:
@@ -59,7 +81,24 @@ class DynamicQueryOperator(QueryOperator):
 
             return {"criteria": final_crit}
 
-        # building the signatures for FastAPI Swagger UI
+        query.__signature__ = query_signature
+
+        self.query = query  # type: ignore
+
+    def _build_operators(
+        self, all_fields: Dict[str, FieldInfo], param_fields: List[str]
+    ) -> Tuple[List, inspect.Signature]:
+        """
+        Converts the model fields into operator tuples and builds the matching
+        signature for the FastAPI Swagger UI.
+        """
+        ops = [
+            op
+            for name, field in all_fields.items()
+            if name in param_fields
+            for op in self.field_to_operator(name, field)
+        ]
+
         signatures: List = [
             inspect.Parameter(
                 op[0],
@@ -70,9 +109,7 @@ class DynamicQueryOperator(QueryOperator):
             for op in ops
         ]
 
-        query.__signature__ = inspect.Signature(signatures)
-
-        self.query = query  # type: ignore
+        return ops, inspect.Signature(signatures)
 
     def query(self):
         "Stub query function for abstract class."
@@ -119,7 +156,7 @@ class NumericQuery(DynamicQueryOperator):
         ops = []
         field_type = field.annotation
 
-        if field_type in [int, float, Union[float, None], Union[int, None]]:
+        if field_type in NUMERIC_TYPES:
             title: str = name or field.alias
 
             ops = [
@@ -143,7 +180,7 @@ class NumericQuery(DynamicQueryOperator):
                 ),
             ]
 
-        if field_type in [int, Union[int, None]]:
+        if field_type in INTEGER_TYPES:
             ops.extend(
                 [
                     (
@@ -204,7 +241,7 @@ class StringQueryOperator(DynamicQueryOperator):
         ops = []
         field_type: type = field.annotation
 
-        if field_type in [str, Union[str, None]]:
+        if field_type in STRING_TYPES:
             title: str = name
 
             ops = [
@@ -19,7 +19,7 @@ class SparseFieldsQuery(QueryOperator):
         self.model = model
 
         model_name = self.model.__name__  # type: ignore
-        model_fields = list(self.model.__fields__.keys())
+        model_fields = list(self.model.model_fields)
 
         self.default_fields = model_fields if default_fields is None else list(default_fields)
 
@@ -35,11 +35,13 @@ class SparseFieldsQuery(QueryOperator):
             Pagination parameters for the API Endpoint.
             """
 
-            properties = _fields.split(",") if isinstance(_fields, str) else self.default_fields
             if _all_fields:
-                properties = model_fields
+                return {"properties": model_fields}
 
-            return {"properties": properties}
+            # drop empty entries, which would otherwise become an invalid "" projection
+            properties = [field for field in _fields.split(",") if field] if isinstance(_fields, str) else None
+
+            return {"properties": properties or self.default_fields}
 
         self.query = query  # type: ignore
 
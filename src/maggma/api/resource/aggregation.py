@@ -93,8 +93,8 @@ class AggregationResource(Resource):
             data = self.pipeline_query_operator.post_process(data, query)
             operator_meta = self.pipeline_query_operator.meta()
 
-            meta = Meta(total_doc=count)
-            response = {"data": data, "meta": {**meta.dict(), **operator_meta}}
+            meta = Meta.model_construct(total_doc=count)
+            response = {"data": data, "meta": {**meta.model_dump(), **operator_meta}}
             response = Response(orjson.dumps(response, default=serialization_helper))  # type: ignore
 
             if self.header_processor is not None:
@@ -1,6 +1,8 @@
 import logging
 from abc import ABCMeta, abstractmethod
-from typing import Dict, Type
+from copy import deepcopy
+from functools import cached_property
+from typing import Any, Dict, Type
 
 from fastapi import APIRouter, FastAPI, Request, Response
 from monty.json import MontyDecoder, MSONable
@@ -29,7 +31,8 @@ class Resource(MSONable, metaclass=ABCMeta):
 
         self.model = api_sanitize(model, allow_dict_msonable=True)
         self.logger = logging.getLogger(type(self).__name__)
-        self.logger.addHandler(logging.NullHandler())
+        if not self.logger.handlers:
+            self.logger.addHandler(logging.NullHandler())
         self.router = APIRouter()
         self.prepare_endpoint()
         self.setup_redirect()
@@ -68,14 +71,29 @@ class Resource(MSONable, metaclass=ABCMeta):
         app.include_router(self.router, prefix="")
         uvicorn.run(app)
 
+    @cached_property
+    def _as_dict_cache(self) -> Dict:
+        d = super().as_dict()  # Ensures sub-classes serialize correctly
+        d["model"] = f"{self.model.__module__}.{self.model.__name__}"
+        return d
+
     def as_dict(self) -> Dict:
         """
         Special as_dict implemented to convert pydantic models into strings.
+        The serialized form is computed once and a copy is returned on each call.
         """
+        return deepcopy(self._as_dict_cache)
 
-        d = super().as_dict()  # Ensures sub-classes serialize correctly
-        d["model"] = f"{self.model.__module__}.{self.model.__name__}"
-        return d
+    def invalidate(self):
+        """
+        Clears the cached serialization, e.g. after changing a constructor argument in place.
+        """
+        self.__dict__.pop("_as_dict_cache", None)
+
+    def __setattr__(self, name: str, value: Any):
+        # any attribute can be a constructor argument, so setting one clears the cached serialization
+        super().__setattr__(name, value)
+        self.invalidate()
 
     @classmethod
     def from_dict(cls, d: Dict):
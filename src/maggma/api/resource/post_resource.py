@@ -80,15 +80,12 @@ class PostOnlyResource(Resource):
 
     def build_dynamic_model_search(self):
         model_name = self.model.__name__
+        query_params = frozenset(entry for i in self.query_operators for entry in signature(i.query).parameters)
 
         def search(**queries: Dict[str, STORE_PARAMS]) -> Dict:
             request: Request = queries.pop("request")  # type: ignore
             queries.pop("temp_response")  # type: ignore
 
-            query_params = [
-                entry for _, i in enumerate(self.query_operators) for entry in signature(i.query).parameters
-            ]
-
             overlap = [key for key in request.query_params if key not in query_params]
             if any(overlap):
                 raise HTTPException(
@@ -112,12 +109,13 @@ class PostOnlyResource(Resource):
                     else:
                         pipeline = generate_query_pipeline(query, self.store)
 
-                        data = list(
-                            self.store._collection.aggregate(
-                                pipeline,
-                                **{field: query[field] for field in query if field in ["hint"]},
-                            )
-                        )
+                        agg_kwargs = {field: query[field] for field in query if field in ["hint"]}
+
+                        # fetch the whole page in one batch rather than the default 101 docs + getMore
+                        if query.get("limit"):
+                            agg_kwargs["batchSize"] = query["limit"]
+
+                        data = list(self.store._collection.aggregate(pipeline, **agg_kwargs))
             except (NetworkTimeout, PyMongoError) as e:
                 if e.timeout:
                     raise HTTPException(
@@ -137,8 +135,8 @@ class PostOnlyResource(Resource):
                 data = operator.post_process(data, query)
                 operator_meta.update(operator.meta())
 
-            meta = Meta(total_doc=count)
-            return {"data": data, "meta": {**meta.dict(), **operator_meta}}
+            meta = Meta.model_construct(total_doc=count)
+            return {"data": data, "meta": {**meta.model_dump(), **operator_meta}}
 
         self.router.post(
             self.sub_path,
@@ -192,15 +192,12 @@ class ReadOnlyResource(Resource):
 
     def build_dynamic_model_search(self):
         model_name = self.model.__name__
+        query_params = frozenset(entry for i in self.query_operators for entry in signature(i.query).parameters)
 
         def search(**queries: Dict[str, STORE_PARAMS]) -> Union[Dict, Response]:
             request: Request = queries.pop("request")  # type: ignore
             temp_response: Response = queries.pop("temp_response")  # type: ignore
 
-            query_params = [
-                entry for _, i in enumerate(self.query_operators) for entry in signature(i.query).parameters
-            ]
-
             overlap = [key for key in request.query_params if key not in query_params]
             if any(overlap):
                 if "limit" in overlap or "skip" in overlap:
@@ -245,6 +242,10 @@ class ReadOnlyResource(Resource):
                         if query.get("agg_hint"):
                             agg_kwargs["hint"] = query["agg_hint"]
 
+                        # fetch the whole page in one batch rather than the default 101 docs + getMore
+                        if query.get("limit"):
+                            agg_kwargs["batchSize"] = query["limit"]
+
                         data = list(self.store._collection.aggregate(pipeline, **agg_kwargs))
 
             except (NetworkTimeout, PyMongoError) as e:
@@ -266,9 +267,9 @@ class ReadOnlyResource(Resource):
                 data = operator.post_process(data, query)
                 operator_meta.update(operator.meta())
 
-            meta = Meta(total_doc=count)
+            meta = Meta.model_construct(total_doc=count)
 
-            response = {"data": data, "meta": {**meta.dict(), **operator_meta}}  # type: ignore
+            response = {"data": data, "meta": {**meta.model_dump(), **operator_meta}}  # type: ignore
 
             if self.disable_validation:
                 response = Response(orjson.dumps(response, default=serialization_helper))  # type: ignore
@@ -188,6 +188,11 @@ class SubmissionResource(Resource):
 
     def build_search_data(self):
         model_name = self.model.__name__
+        query_params = frozenset(
+            entry
+            for i in self.get_query_operators  # type: ignore
+            for entry in signature(i.query).parameters
+        )
 
         def search(**queries: STORE_PARAMS):
             request: Request = queries.pop("request")  # type: ignore
@@ -195,12 +200,6 @@ class SubmissionResource(Resource):
 
             query: STORE_PARAMS = merge_queries(list(queries.values()))
 
-            query_params = [
-                entry
-                for _, i in enumerate(self.get_query_operators)  # type: ignore
-                for entry in signature(i.query).parameters
-            ]
-
             overlap = [key for key in request.query_params if key not in query_params]
             if any(overlap):
                 raise HTTPException(
@@ -220,12 +219,13 @@ class SubmissionResource(Resource):
                     else:
                         pipeline = generate_query_pipeline(query, self.store)
 
-                        data = list(
-                            self.store._collection.aggregate(
-                                pipeline,
-                                **{field: query[field] for field in query if field in ["hint"]},
-                            )
-                        )
+                        agg_kwargs = {field: query[field] for field in query if field in ["hint"]}
+
+                        # fetch the whole page in one batch rather than the default 101 docs + getMore
+                        if query.get("limit"):
+                            agg_kwargs["batchSize"] = query["limit"]
+
+                        data = list(self.store._collection.aggregate(pipeline, **agg_kwargs))
             except (NetworkTimeout, PyMongoError) as e:
                 if e.timeout:
                     raise HTTPException(
@@ -239,12 +239,12 @@ class SubmissionResource(Resource):
                         "or remove sorting fields and sort data locally.",
                     )
 
-            meta = Meta(total_doc=count)
+            meta = Meta.model_construct(total_doc=count)
 
             for operator in self.get_query_operators:  # type: ignore
                 data = operator.post_process(data, query)
 
-            return {"data": data, "meta": meta.dict()}
+            return {"data": data, "meta": meta.model_dump()}
 
         self.router.get(
             self.get_sub_path,
@@ -258,6 +258,11 @@ class SubmissionResource(Resource):
 
     def build_post_data(self):
         model_name = self.model.__name__
+        query_params = frozenset(
+            entry
+            for i in self.post_query_operators  # type: ignore
+            for entry in signature(i.query).parameters
+        )
 
         def post_data(**queries: STORE_PARAMS):
             request: Request = queries.pop("request")  # type: ignore
@@ -265,12 +270,6 @@ class SubmissionResource(Resource):
 
             query: STORE_PARAMS = merge_queries(list(queries.values()))
 
-            query_params = [
-                entry
-                for _, i in enumerate(self.post_query_operators)  # type: ignore
-                for entry in signature(i.query).parameters
-            ]
-
             overlap = [key for key in request.query_params if key not in query_params]
             if any(overlap):
                 raise HTTPException(
@@ -326,6 +325,11 @@ class SubmissionResource(Resource):
 
     def build_patch_data(self):
         model_name = self.model.__name__
+        query_params = frozenset(
+            entry
+            for i in self.patch_query_operators  # type: ignore
+            for entry in signature(i.query).parameters
+        )
 
         def patch_data(**queries: STORE_PARAMS):
             request: Request = queries.pop("request")  # type: ignore
@@ -333,12 +337,6 @@ class SubmissionResource(Resource):
 
             query: STORE_PARAMS = merge_queries(list(queries.values()))
 
-            query_params = [
-                entry
-                for _, i in enumerate(self.patch_query_operators)  # type: ignore
-                for entry in signature(i.query).parameters
-            ]
-
             overlap = [key for key in request.query_params if key not in query_params]
             if any(overlap):
                 raise HTTPException(
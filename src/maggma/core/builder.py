@@ -42,7 +42,8 @@ class Builder(MSONable, metaclass=ABCMeta):
         self.chunk_size = chunk_size
         self.total = None  # type: Optional[int]
         self.logger = logging.getLogger(type(self).__name__)
-        self.logger.addHandler(logging.NullHandler())
+        if not self.logger.handlers:
+            self.logger.addHandler(logging.NullHandler())
 
     def connect(self):
         """
@@ -59,7 +59,8 @@ class Store(MSONable, metaclass=ABCMeta):
         )
         self.validator = validator
         self.logger = logging.getLogger(type(self).__name__)
-        self.logger.addHandler(logging.NullHandler())
+        if not self.logger.handlers:
+            self.logger.addHandler(logging.NullHandler())
 
     @abstractproperty
     def _collection(self):
@@ -266,10 +267,8 @@ class Store(MSONable, metaclass=ABCMeta):
                 for d in target.query(criteria=criteria, properties=props)
             }
 
-            new_keys = set(target_dates.keys()) - set(dates.keys())
-            updated_keys = {key for key, date in dates.items() if target_dates.get(key, datetime.min) > date}
-
-            return list(new_keys | updated_keys)
+            # compare the two bulk reads in a single pass, rather than querying per document
+            return [key for key, date in target_dates.items() if key not in dates or date > dates[key]]
 
         criteria = {self.last_updated_field: {"$gt": self._lu_func[1](self.last_updated)}}
         return target.distinct(field=self.key, criteria=criteria)
@@ -12,7 +12,7 @@ from monty.dev import requires
 
 from maggma.core import Sort, Store, StoreError
 from maggma.stores.mongolike import MongoStore
-from maggma.utils import lazy_substitute, substitute
+from maggma.utils import split_aliases, substitute, substitute_paths  # noqa: F401
 
 try:
     import hvac
@@ -202,6 +202,9 @@ class AliasingStore(Store):
         self.aliases = aliases
         # Given the internal key tells us what the external key is
         self.reverse_aliases = {v: k for k, v in aliases.items()}
+        # Pre-split paths so documents can be substituted without re-parsing the keys
+        self._alias_paths = split_aliases(self.aliases)
+        self._reverse_alias_paths = split_aliases(self.reverse_aliases)
         self.kwargs = kwargs
 
         kwargs.update(
@@ -226,9 +229,7 @@ class AliasingStore(Store):
         Args:
             criteria: PyMongo filter for documents to count in
         """
-        criteria = criteria if criteria else {}
-        lazy_substitute(criteria, self.reverse_aliases)
-        return self.store.count(criteria)
+        return self.store.count(self._alias_criteria(criteria))
 
     def query(
         self,
@@ -249,17 +250,15 @@ class AliasingStore(Store):
             skip: number documents to skip
             limit: limit on total number of documents returned
         """
-
-        criteria = criteria if criteria else {}
+        criteria = self._alias_criteria(criteria)
 
         if properties is not None:
             if isinstance(properties, list):
                 properties = {p: 1 for p in properties}
-            substitute(properties, self.reverse_aliases)
+            substitute_paths(properties, self._reverse_alias_paths)
 
-        lazy_substitute(criteria, self.reverse_aliases)
         for d in self.store.query(properties=properties, criteria=criteria, sort=sort, limit=limit, skip=skip):
-            substitute(d, self.aliases)
+            substitute_paths(d, self._alias_paths)
             yield d
 
     def distinct(self, field: str, criteria: Optional[Dict] = None, all_exist: bool = False) -> List:
@@ -270,11 +269,10 @@ class AliasingStore(Store):
             field: the field(s) to get distinct values for
             criteria: PyMongo filter for documents to search in
         """
-        criteria = criteria if criteria else {}
-        lazy_substitute(criteria, self.reverse_aliases)
+        criteria = self._alias_criteria(criteria)
 
         # substitute forward
-        return self.store.distinct(self.aliases[field], criteria=criteria)
+        return self.store.distinct(self.aliases.get(field, field), criteria=criteria)
 
     def groupby(
         self,
@@ -305,17 +303,15 @@ class AliasingStore(Store):
         keys = keys if isinstance(keys, list) else [keys]
 
         # Make the aliasing transformations on keys
-        keys = [self.aliases[k] if k in self.aliases else k for k in keys]
+        keys = [self.aliases.get(k, k) for k in keys]
 
         # Update criteria and properties based on aliases
-        criteria = criteria if criteria else {}
+        criteria = self._alias_criteria(criteria)
 
         if properties is not None:
             if isinstance(properties, list):
                 properties = {p: 1 for p in properties}
-            substitute(properties, self.reverse_aliases)
-
-        lazy_substitute(criteria, self.reverse_aliases)
+            substitute_paths(properties, self._reverse_alias_paths)
 
         return self.store.groupby(keys=keys, properties=properties, criteria=criteria, skip=skip, limit=limit)
 
@@ -332,11 +328,13 @@ class AliasingStore(Store):
         """
         key = key if key else self.key
 
+        if not isinstance(docs, list):
+            docs = [docs]
+
         for d in docs:
-            substitute(d, self.reverse_aliases)
+            substitute_paths(d, self._reverse_alias_paths)
 
-        if key in self.aliases:
-            key = self.aliases[key]
+        key = self.aliases.get(key, key) if isinstance(key, str) else key
 
         self.store.update(docs, key=key)
 
@@ -348,12 +346,19 @@ class AliasingStore(Store):
             criteria: query dictionary to match
         """
         # Update criteria and properties based on aliases
-        lazy_substitute(criteria, self.reverse_aliases)
-        self.store.remove_docs(criteria)
+        self.store.remove_docs(self._alias_criteria(criteria))
+
+    def _alias_criteria(self, criteria: Optional[Dict]) -> Dict:
+        """
+        Translates the top level external keys of a criteria dict into the internal
+        keys of the underlying store, so the query is evaluated server side.
+        """
+        if not criteria:
+            return {}
+        return {self.aliases.get(k, k): v for k, v in criteria.items()}
 
     def ensure_index(self, key, unique=False, **kwargs):
-        if key in self.aliases:
-            key = self.aliases
+        key = self.aliases.get(key, key)
         return self.store.ensure_index(key, unique, **kwargs)
 
     def close(self):
@@ -395,6 +400,7 @@ class SandboxStore(Store):
         self.store = store
         self.sandbox = sandbox
         self.exclusive = exclusive
+        self._sbxn_indexed = False
         super().__init__(
             key=self.store.key,
             last_updated_field=self.store.last_updated_field,
@@ -420,6 +426,15 @@ class SandboxStore(Store):
             return {"sbxn": self.sandbox}
         return {"$or": [{"sbxn": {"$in": [self.sandbox]}}, {"sbxn": {"$exists": False}}]}
 
+    def _sbx_merge(self, criteria: Optional[Dict]) -> Dict:
+        """
+        Combines the user criteria with the sandbox criteria using $and, so neither
+        overrides the other and the sandbox filter is evaluated server side.
+        """
+        if not criteria:
+            return self.sbx_criteria
+        return {"$and": [criteria, self.sbx_criteria]}
+
     def count(self, criteria: Optional[Dict] = None) -> int:
         """
         Counts the number of documents matching the query criteria.
@@ -427,7 +442,7 @@ class SandboxStore(Store):
         Args:
             criteria: PyMongo filter for documents to count in
         """
-        criteria = dict(**criteria, **self.sbx_criteria) if criteria else self.sbx_criteria
+        criteria = self._sbx_merge(criteria)
         return self.store.count(criteria=criteria)
 
     def query(
@@ -449,7 +464,7 @@ class SandboxStore(Store):
             skip: number documents to skip
             limit: limit on total number of documents returned
         """
-        criteria = dict(**criteria, **self.sbx_criteria) if criteria else self.sbx_criteria
+        criteria = self._sbx_merge(criteria)
         return self.store.query(properties=properties, criteria=criteria, sort=sort, limit=limit, skip=skip)
 
     def groupby(
@@ -477,7 +492,7 @@ class SandboxStore(Store):
         Returns:
             generator returning tuples of (dict, list of docs)
         """
-        criteria = dict(**criteria, **self.sbx_criteria) if criteria else self.sbx_criteria
+        criteria = self._sbx_merge(criteria)
 
         return self.store.groupby(keys=keys, properties=properties, criteria=criteria, skip=skip, limit=limit)
 
@@ -492,12 +507,16 @@ class SandboxStore(Store):
                  a single field, or None if the Store's key
                  field is to be used
         """
+        if not isinstance(docs, list):
+            docs = [docs]
+
         for d in docs:
-            if "sbxn" in d:
-                d["sbxn"] = list(set(d["sbxn"] + [self.sandbox]))
-            else:
+            if "sbxn" not in d:
                 d["sbxn"] = [self.sandbox]
+            elif self.sandbox not in d["sbxn"]:
+                d["sbxn"] = [*d["sbxn"], self.sandbox]
 
+        # all documents go to the underlying store in a single batched update
         self.store.update(docs, key=key)
 
     def remove_docs(self, criteria: Dict):
@@ -508,7 +527,7 @@ class SandboxStore(Store):
             criteria: query dictionary to match
         """
         # Update criteria and properties based on aliases
-        criteria = dict(**criteria, **self.sbx_criteria) if criteria else self.sbx_criteria
+        criteria = self._sbx_merge(criteria)
         self.store.remove_docs(criteria)
 
     def ensure_index(self, key, unique=False, **kwargs):
@@ -523,6 +542,13 @@ class SandboxStore(Store):
 
     def connect(self, force_reset=False):
         self.store.connect(force_reset=force_reset)
+        # sandbox filtering is applied to every query, so index it once if the store supports it
+        if not self._sbxn_indexed or force_reset:
+            try:
+                self._sbxn_indexed = self.store.ensure_index("sbxn")
+            except NotImplementedError:
+                self.logger.debug(f"{self.store.name} does not support indexing sbxn")
+                self._sbxn_indexed = True
 
     def __eq__(self, other: object) -> bool:
         """
@@ -1,10 +1,10 @@
 """Stores for connecting to AWS data."""
 
-import threading
 import warnings
 import zlib
 from concurrent.futures import wait
 from concurrent.futures.thread import ThreadPoolExecutor
+from functools import partial
 from hashlib import sha1
 from io import BytesIO
 from json import dumps
@@ -21,10 +21,26 @@ try:
     import boto3
     import botocore
     from boto3.session import Session
+    from botocore.config import Config
     from botocore.exceptions import ClientError
 except (ImportError, ModuleNotFoundError):
     boto3 = None  # type: ignore
 
+try:
+    import zstandard
+except (ImportError, ModuleNotFoundError):
+    zstandard = None  # type: ignore
+
+try:
+    import lz4.frame
+except (ImportError, ModuleNotFoundError):
+    lz4 = None  # type: ignore
+
+COMPRESSION_CODECS = ("zlib", "zstd", "lz4")
+
+# Size of the chunks compressed objects are read from S3 in
+READ_CHUNK_SIZE = 1024 * 1024
+
 
 class S3Store(Store):
     """
@@ -39,6 +55,7 @@ class S3Store(Store):
         bucket: str,
         s3_profile: Optional[Union[str, dict]] = None,
         compress: bool = False,
+        compression_codec: str = "zlib",
         endpoint_url: Optional[str] = None,
         sub_dir: Optional[str] = None,
         s3_workers: int = 1,
@@ -64,10 +81,14 @@ class S3Store(Store):
                     aws_session_token (string) -- AWS temporary session token
                     region_name (string) -- Default region when creating new connections
             compress: compress files inserted into the store.
+            compression_codec: codec used to compress files when `compress` is True. One of
+                "zlib", "zstd" (requires zstandard) or "lz4" (requires lz4). Objects are always
+                decompressed according to the codec recorded in their metadata.
             endpoint_url: this allows the interface with minio service; ignored if
                 `ssh_tunnel` is provided, in which case it is inferred.
             sub_dir: subdirectory of the S3 bucket to store the data.
-            s3_workers: number of concurrent S3 puts to run.
+            s3_workers: number of concurrent S3 puts to run. The workers share a single
+                thread-safe S3 client whose connection pool is sized to match.
             s3_resource_kwargs: additional kwargs to pass to the boto3 session resource.
             ssh_tunnel: optional SSH tunnel to use for the S3 connection.
             key: main key to index on.
@@ -80,6 +101,12 @@ class S3Store(Store):
         """
         if boto3 is None:
             raise RuntimeError("boto3 and botocore are required for S3Store")
+        if compression_codec not in COMPRESSION_CODECS:
+            raise ValueError(f"Unknown compression codec {compression_codec}, must be one of {COMPRESSION_CODECS}")
+        if compression_codec == "zstd" and zstandard is None:
+            raise RuntimeError("zstandard is required for zstd compression in S3Store")
+        if compression_codec == "lz4" and lz4 is None:
+            raise RuntimeError("lz4 is required for lz4 compression in S3Store")
         self.index_store_kwargs = index_store_kwargs or {}
         if index_store_kwargs:
             d_ = index.as_dict()
@@ -90,6 +117,7 @@ class S3Store(Store):
         self.bucket = bucket
         self.s3_profile = s3_profile
         self.compress = compress
+        self.compression_codec = compression_codec
         self.endpoint_url = endpoint_url
         self.sub_dir = sub_dir.strip("/") + "/" if sub_dir else ""
         self.s3: Any = None
@@ -111,7 +139,6 @@ class S3Store(Store):
             )
         kwargs["key"] = str(index.key)
 
-        self._thread_local = threading.local()
         super().__init__(**kwargs)
 
     @property
@@ -192,7 +219,7 @@ class S3Store(Store):
             else:
                 try:
                     # TODO: This is ugly and unsafe, do some real checking before pulling data
-                    data = self.s3_bucket.Object(self._get_full_key_path(doc[self.key])).get()["Body"].read()
+                    body = self.s3_bucket.Object(self._get_full_key_path(doc[self.key])).get()["Body"]
                 except botocore.exceptions.ClientError as e:
                     # If a client error is thrown, then check that it was a NoSuchKey or NoSuchBucket error.
                     # If it was a NoSuchKey error, then the object does not exist.
@@ -206,8 +233,16 @@ class S3Store(Store):
                     else:
                         raise e
 
+                compress_header = doc.get("compression", "")
+                if self.unpack_data and compress_header:
+                    # decompress as the object streams in rather than buffering the compressed payload
+                    data = self._stream_decompress(body, compress_header)
+                    compress_header = ""
+                else:
+                    data = body.read()
+
                 if self.unpack_data:
-                    data = self._read_data(data=data, compress_header=doc.get("compression", ""))
+                    data = self._read_data(data=data, compress_header=compress_header)
 
                     if self.last_updated_field in doc:
                         data[self.last_updated_field] = doc[self.last_updated_field]
@@ -226,12 +261,12 @@ class S3Store(Store):
         Returns:
             Dict: Dictionary representation of the data.
         """
-        return self._unpack(data=data, compressed=compress_header == "zlib")
+        if compress_header:
+            data = self._get_decompression_function(compress_header)(data)
+        return self._unpack(data=data)
 
     @staticmethod
-    def _unpack(data: bytes, compressed: bool):
-        if compressed:
-            data = zlib.decompress(data)
+    def _unpack(data: bytes):
         # requires msgpack-python to be installed to fix string encoding problem
         # https://github.com/msgpack/msgpack/issues/121
         # During recursion
@@ -359,12 +394,9 @@ class S3Store(Store):
         if self.ssh_tunnel is not None:
             self.ssh_tunnel.start()
 
-        if not hasattr(self._thread_local, "s3_bucket"):
-            if isinstance(self.s3_profile, dict):
-                return Session(**self.s3_profile)
-            return Session(profile_name=self.s3_profile)
-
-        return None
+        if isinstance(self.s3_profile, dict):
+            return Session(**self.s3_profile)
+        return Session(profile_name=self.s3_profile)
 
     def _get_endpoint_url(self):
         if self.ssh_tunnel is None:
@@ -372,23 +404,19 @@ class S3Store(Store):
         host, port = self.ssh_tunnel.local_address
         return f"http://{host}:{port}"
 
-    def _get_bucket(self):
-        """If on the main thread return the bucket created above, else create a new
-        bucket on each thread."""
-        if threading.current_thread().name == "MainThread":
-            return self.s3_bucket
-
-        if not hasattr(self._thread_local, "s3_bucket"):
-            _, bucket = self._get_resource_and_bucket()
-            self._thread_local.s3_bucket = bucket
-
-        return self._thread_local.s3_bucket
-
     def _get_resource_and_bucket(self):
         """Helper function to create the resource and bucket objects."""
         session = self._get_session()
         endpoint_url = self._get_endpoint_url()
-        resource = session.resource("s3", endpoint_url=endpoint_url, **self.s3_resource_kwargs)
+
+        # the underlying client is shared by all s3_workers threads, so make sure
+        # its connection pool is large enough for them all; user settings take precedence
+        resource_kwargs = dict(self.s3_resource_kwargs)
+        pool_config = Config(max_pool_connections=max(10, self.s3_workers))
+        user_config = resource_kwargs.pop("config", None)
+        resource_kwargs["config"] = pool_config.merge(user_config) if user_config is not None else pool_config
+
+        resource = session.resource("s3", endpoint_url=endpoint_url, **resource_kwargs)
         try:
             resource.meta.client.head_bucket(Bucket=self.bucket)
         except ClientError:
@@ -410,12 +438,55 @@ class S3Store(Store):
 
     def _get_compression_function(self) -> Callable:
         """Returns the function to use for compressing data."""
+        if self.compression_codec == "zstd":
+            return zstandard.ZstdCompressor(level=1, threads=-1).compress
+        if self.compression_codec == "lz4":
+            return partial(lz4.frame.compress, compression_level=0)
         return zlib.compress
 
-    def _get_decompression_function(self) -> Callable:
-        """Returns the function to use for decompressing data."""
+    def _get_decompression_function(self, compression: Optional[str] = None) -> Callable:
+        """Returns the function to use for decompressing data.
+
+        Args:
+            compression: codec recorded for the data, defaults to the codec of this store.
+        """
+        compression = compression or self.compression_codec
+        if compression == "zstd":
+            if zstandard is None:
+                raise RuntimeError("zstandard is required to read zstd compressed data")
+            return zstandard.ZstdDecompressor().decompress
+        if compression == "lz4":
+            if lz4 is None:
+                raise RuntimeError("lz4 is required to read lz4 compressed data")
+            return lz4.frame.decompress
         return zlib.decompress
 
+    @staticmethod
+    def _stream_decompress(body, compression: str) -> bytes:
+        """Decompresses data chunk by chunk from a file-like object such as an S3 response body,
+        so the download overlaps with decompression.
+
+        Args:
+            body: file-like object with the compressed data.
+            compression: codec the data was compressed with.
+        """
+        if compression == "zstd":
+            if zstandard is None:
+                raise RuntimeError("zstandard is required to read zstd compressed data")
+            with zstandard.ZstdDecompressor().stream_reader(body, read_size=READ_CHUNK_SIZE) as reader:
+                return reader.read()
+
+        chunks = iter(partial(body.read, READ_CHUNK_SIZE), b"")
+        if compression == "lz4":
+            if lz4 is None:
+                raise RuntimeError("lz4 is required to read lz4 compressed data")
+            lz4_decompressor = lz4.frame.LZ4FrameDecompressor()
+            return b"".join(lz4_decompressor.decompress(chunk) for chunk in chunks)
+
+        zlib_decompressor = zlib.decompressobj()
+        data = b"".join(zlib_decompressor.decompress(chunk) for chunk in chunks)
+        return data + zlib_decompressor.flush()
+
     def write_doc_to_s3(self, doc: Dict, search_keys: List[str]) -> Dict:
         """
         Write the data to s3 and return the metadata to be inserted into the index db.
@@ -428,8 +499,6 @@ class S3Store(Store):
         Returns:
             Dict: The metadata to be inserted into the index db
         """
-        s3_bucket = self._get_bucket()
-
         search_doc = {k: doc[k] for k in search_keys}
         search_doc[self.key] = doc[self.key]  # Ensure key is in metadata
         if self.sub_dir != "":
@@ -444,8 +513,7 @@ class S3Store(Store):
         data = msgpack.packb(doc, default=monty_default)
 
         if self.compress:
-            # Compress with zlib if chosen
-            search_doc["compression"] = "zlib"
+            search_doc["compression"] = self.compression_codec
             data = self._get_compression_function()(data)
 
         # keep a record of original keys, in case these are important for the individual researcher
@@ -454,8 +522,10 @@ class S3Store(Store):
         s3_to_mongo_keys["s3-to-mongo-keys"] = "s3-to-mongo-keys"  # inception
         # encode dictionary since values have to be strings
         search_doc["s3-to-mongo-keys"] = dumps(s3_to_mongo_keys)
-        s3_bucket.upload_fileobj(
+        # boto3 clients are thread-safe, unlike resources, so all workers share one
+        self.s3.meta.client.upload_fileobj(
             Fileobj=BytesIO(data),
+            Bucket=self.bucket,
             Key=self._get_full_key_path(str(doc[self.key])),
             ExtraArgs={"Metadata": {s3_to_mongo_keys[k]: str(v) for k, v in search_doc.items()}},
         )
@@ -536,10 +606,11 @@ class S3Store(Store):
         objects = bucket.objects.filter(Prefix=self.sub_dir)
         for obj in objects:
             key_ = self._get_full_key_path(obj.key)
-            data = self.s3_bucket.Object(key_).get()["Body"].read()
+            response = self.s3_bucket.Object(key_).get()
 
-            if self.compress:
-                data = self._get_decompression_function()(data)
+            # the codec is recorded in the object metadata at write time
+            compression = response.get("Metadata", {}).get("compression")
+            data = self._stream_decompress(response["Body"], compression) if compression else response["Body"].read()
             unpacked_data = msgpack.unpackb(data, raw=False)
             self.update(unpacked_data, **kwargs)
 
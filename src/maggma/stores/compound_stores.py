@@ -1,14 +1,95 @@
 """ Special stores that combine underlying Stores together. """
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from itertools import groupby
-from typing import Dict, Iterator, List, Optional, Tuple, Union
+from json import dumps
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
 
-from pydash import set_
 from pymongo import MongoClient
+from pymongo.collection import Collection
+from pymongo.errors import OperationFailure
 
 from maggma.core import Sort, Store, StoreError
 from maggma.stores.mongolike import MongoStore
 
+# MongoDB server versions by (host, port), so reconnecting does not cost a round trip
+_SERVER_VERSION_CACHE: Dict[Tuple, Tuple[int, ...]] = {}
+
+# MongoClients shared between JointStores connecting with the same settings, along with
+# the number of stores using each, so connection pools and monitoring threads are reused
+_CLIENTS: Dict[Tuple, List] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def _reset_clients():
+    """
+    Forgets the shared MongoClients in a forked process, as pymongo clients
+    must not be used across a fork.
+    """
+    _CLIENTS.clear()
+    _CLIENTS_LOCK.release()
+
+
+if hasattr(os, "register_at_fork"):
+    # hold the lock while forking so the child never inherits the table mid-update
+    os.register_at_fork(
+        before=_CLIENTS_LOCK.acquire,
+        after_in_parent=_CLIENTS_LOCK.release,
+        after_in_child=_reset_clients,
+    )
+
+
+def _get_server_version(client: MongoClient, server: Tuple) -> Tuple[int, ...]:
+    """
+    Gets the version of the MongoDB server a client is connected to.
+
+    Args:
+        client: client connected to the server
+        server: key identifying the server, such as (host, port)
+    """
+    if server not in _SERVER_VERSION_CACHE:
+        version = client.server_info()["version"]
+        _SERVER_VERSION_CACHE[server] = tuple(int(v) for v in re.findall(r"\d+", version)[:3])
+    return _SERVER_VERSION_CACHE[server]
+
+
+def _acquire_client(
+    host: str, port: int, username: str, password: str, mongoclient_kwargs: Dict
+) -> Tuple[Tuple, MongoClient]:
+    """
+    Gets a shared MongoClient for these connection settings, creating it if needed.
+
+    Returns:
+        key to release the client with and the client
+    """
+    key = (host, port, username, password, dumps(mongoclient_kwargs, sort_keys=True, default=str))
+    with _CLIENTS_LOCK:
+        if key not in _CLIENTS:
+            client: MongoClient = (
+                MongoClient(host=host, port=port, username=username, password=password, **mongoclient_kwargs)
+                if username != ""
+                else MongoClient(host, port, **mongoclient_kwargs)
+            )
+            _CLIENTS[key] = [client, 0]
+        _CLIENTS[key][1] += 1
+        return key, _CLIENTS[key][0]
+
+
+def _release_client(key: Tuple):
+    """
+    Releases a shared MongoClient, closing it once no store uses it anymore.
+    """
+    with _CLIENTS_LOCK:
+        entry = _CLIENTS.get(key)
+        if entry is None:
+            return
+        entry[1] -= 1
+        if entry[1] <= 0:
+            del _CLIENTS[key]
+            entry[0].close()
+
 
 class JointStore(Store):
     """
@@ -27,6 +108,7 @@ class JointStore(Store):
         main: Optional[str] = None,
         merge_at_root: bool = False,
         mongoclient_kwargs: Optional[Dict] = None,
+        create_indexes: bool = True,
         **kwargs,
     ):
         """
@@ -41,6 +123,8 @@ class JointStore(Store):
             main: name for the main collection
                 if not specified this defaults to the first
                 in collection_names list.
+            create_indexes: whether to index the key of every collection on connect.
+                If False, a warning is logged for collections missing that index.
         """
         self.database = database
         self.collection_names = collection_names
@@ -52,7 +136,11 @@ class JointStore(Store):
         self.main = main or collection_names[0]
         self.merge_at_root = merge_at_root
         self.mongoclient_kwargs = mongoclient_kwargs or {}
+        self.create_indexes = create_indexes
         self.kwargs = kwargs
+        self._server_version: Tuple[int, ...] = ()
+        self._client_key: Optional[Tuple] = None
+        self._join_stages: Tuple[Tuple, Tuple[Dict, ...]] = ((), ())
 
         super().__init__(**kwargs)
 
@@ -72,27 +160,44 @@ class JointStore(Store):
             force_reset: whether to reset the connection or not when the Store is
                 already connected.
         """
-        if not self._coll or force_reset:
-            conn: MongoClient = (
-                MongoClient(
-                    host=self.host,
-                    port=self.port,
-                    username=self.username,
-                    password=self.password,
-                    **self.mongoclient_kwargs,
-                )
-                if self.username != ""
-                else MongoClient(self.host, self.port, **self.mongoclient_kwargs)
+        if self._coll is None or force_reset:
+            if self._client_key is not None:
+                _release_client(self._client_key)
+            self._client_key, conn = _acquire_client(
+                self.host, self.port, self.username, self.password, self.mongoclient_kwargs
             )
             db = conn[self.database]
             self._coll = db[self.main]
-            self._has_merge_objects = self._collection.database.client.server_info()["version"] > "3.6"
+
+            try:
+                # index the join key so every $lookup is an index probe instead of a collection scan
+                for cname in self.collection_names:
+                    if not self.create_indexes:
+                        indexed = [next(iter(index["key"]))[0] for index in db[cname].index_information().values()]
+                        if self.key not in indexed:
+                            self.logger.warning(f"No index on {self.key} for {cname}, joins will scan it")
+                        continue
+                    try:
+                        db[cname].create_index(self.key, background=True)
+                    except OperationFailure:
+                        self.logger.warning(f"Could not create an index on {self.key} for {cname}")
+
+                self._server_version = _get_server_version(conn, (self.host, self.port))
+            except Exception:
+                self.close()
+                raise
+            self._has_merge_objects = self._server_version >= (3, 6)
 
     def close(self):
         """
         Closes underlying database connections.
+        The client is shared with other JointStores and only closed once none of them use it.
         """
-        self._collection.database.client.close()
+        if self._client_key is None:
+            raise StoreError("Must connect Mongo-like store before attempting to use it")
+        _release_client(self._client_key)
+        self._client_key = None
+        self._coll = None
 
     @property
     def _collection(self):
@@ -106,7 +211,7 @@ class JointStore(Store):
         """
         alll non-main collection names.
         """
-        return list(set(self.collection_names) - {self.main})
+        return [cname for cname in self.collection_names if cname != self.main]
 
     @property
     def last_updated(self) -> datetime:
@@ -114,13 +219,15 @@ class JointStore(Store):
         Special last_updated for this JointStore
         that checks all underlying collections.
         """
-        lus = []
-        for cname in self.collection_names:
+
+        def collection_last_updated(cname: str) -> datetime:
             store = MongoStore.from_collection(self._collection.database[cname])
             store.last_updated_field = self.last_updated_field
-            lu = store.last_updated
-            lus.append(lu)
-        return max(lus)
+            return store.last_updated
+
+        # each lookup is an indexed sort, so issue them concurrently rather than one after another
+        with ThreadPoolExecutor(max_workers=len(self.collection_names)) as executor:
+            return max(executor.map(collection_last_updated, self.collection_names))
 
     # TODO: implement update?
     def update(self, docs, update_lu=True, key=None, **kwargs):
@@ -144,31 +251,103 @@ class JointStore(Store):
         """
         raise NotImplementedError("No ensure_index method for JointStore")
 
-    def _get_pipeline(self, criteria=None, properties=None, skip=0, limit=0):
+    def _get_pipeline(self, criteria=None, properties=None, sort=None, skip=0, limit=0):
         """
         Gets the aggregation pipeline for query and query_one.
 
         Args:
             properties: properties to be returned
             criteria: criteria to filter by
+            sort: Dictionary of sort order for fields
             skip: docs to skip
             limit: limit results to N docs
         Returns:
             list of aggregation operators
         """
         pipeline = []
-        collection_names = list(set(self.collection_names) - set(self.main))
-        for cname in collection_names:
-            pipeline.append(
-                {
-                    "$lookup": {
-                        "from": cname,
-                        "localField": self.key,
-                        "foreignField": self.key,
-                        "as": cname,
-                    }
-                }
+        collection_names = self.nonmain_names
+
+        # filter on the main collection before joining so only matching documents are looked up
+        main_criteria, criteria = self._split_criteria(criteria, collection_names)
+        if main_criteria:
+            pipeline.append({"$match": main_criteria})
+
+        sort_stage = {k: Sort(v).value if isinstance(v, int) else v.value for k, v in (sort or {}).items()}
+        if not self.merge_at_root and all(self._is_main_field(k, collection_names) for k in sort_stage):
+            # sorting on main fields before the joins lets the server use an index
+            if sort_stage:
+                pipeline.append({"$sort": sort_stage})
+                sort_stage = {}
+            if not criteria and limit > 0:
+                # every main document yields at least one joined document, but duplicate keys
+                # in the other collections can yield more, so only bound the documents to join
+                pipeline.append({"$limit": skip + limit})
+
+        projections = self._get_lookup_projections(properties, [*criteria, *sort_stage], collection_names)
+        if projections:
+            pipeline.extend(self._get_join_stages(collection_names, projections))
+        else:
+            # joining whole documents only depends on the store configuration, so reuse those stages
+            config = (
+                tuple(self.collection_names),
+                self.main,
+                self.key,
+                self.last_updated_field,
+                self.merge_at_root,
+                self._server_version,
             )
+            if self._join_stages[0] != config:
+                self._join_stages = (config, tuple(self._get_join_stages(collection_names, {})))
+            pipeline.extend(self._join_stages[1])
+
+        if criteria:
+            pipeline.append({"$match": criteria})
+        if sort_stage:
+            pipeline.append({"$sort": sort_stage})
+        if isinstance(properties, list):
+            properties = {k: 1 for k in properties}
+        if properties:
+            pipeline.append({"$project": properties})
+
+        if skip > 0:
+            pipeline.append({"$skip": skip})
+
+        if limit > 0:
+            pipeline.append({"$limit": limit})
+        return pipeline
+
+    def _get_join_stages(self, collection_names: List[str], projections: Dict[str, Dict]) -> List[Dict]:
+        """
+        Gets the aggregation stages joining the other collections onto the main one
+        and computing the overall last_updated.
+
+        Args:
+            collection_names: names of the joined collections
+            projections: projection for each joined collection that does not need the full documents
+        Returns:
+            list of aggregation operators
+        """
+        pipeline = []
+        for cname in collection_names:
+            lookup = {"from": cname, "as": cname}
+            if cname not in projections:
+                lookup.update(localField=self.key, foreignField=self.key)
+            elif self._server_version >= (5, 0):
+                # the concise form still uses the foreign key index
+                lookup.update(
+                    localField=self.key,
+                    foreignField=self.key,
+                    pipeline=[{"$project": projections[cname]}],
+                )
+            else:
+                lookup.update(
+                    let={"key": f"${self.key}"},
+                    pipeline=[
+                        {"$match": {"$expr": {"$eq": [f"${self.key}", "$$key"]}}},
+                        {"$project": projections[cname]},
+                    ],
+                )
+            pipeline.append({"$lookup": lookup})
 
             if self.merge_at_root:
                 if not self._has_merge_objects:
@@ -198,23 +377,89 @@ class JointStore(Store):
 
         # Do projection for max last_updated
         lu_max_fields = [f"${self.last_updated_field}"]
-        lu_max_fields.extend([f"${cname}.{self.last_updated_field}" for cname in self.collection_names])
+        lu_max_fields.extend([f"${cname}.{self.last_updated_field}" for cname in collection_names])
         lu_proj = {self.last_updated_field: {"$max": lu_max_fields}}
         pipeline.append({"$addFields": lu_proj})
+        return pipeline
 
-        if criteria:
-            pipeline.append({"$match": criteria})
-        if isinstance(properties, list):
-            properties = {k: 1 for k in properties}
-        if properties:
-            pipeline.append({"$project": properties})
+    def _get_lookup_projections(
+        self, properties: Union[Dict, List, None], fields: List[str], collection_names: List[str]
+    ) -> Dict[str, Dict]:
+        """
+        Gets the projections to apply to the joined documents, so only the requested
+        fields are shipped from the other collections.
 
-        if skip > 0:
-            pipeline.append({"$skip": skip})
+        Args:
+            properties: properties to be returned
+            fields: fields filtered or sorted on after the joins
+            collection_names: names of the joined collections
+        Returns:
+            projection for each joined collection that does not need the full documents
+        """
+        if not properties or self.merge_at_root:
+            return {}
+        if isinstance(properties, dict):
+            if not all(properties.values()):
+                # exclusion projections cannot be narrowed down per collection
+                return {}
+            properties = list(properties)
+        if any(f.startswith("$") or f in collection_names for f in fields):
+            # operators and whole joined documents can reference any field
+            return {}
+        properties = properties + fields
+
+        projections = {}
+        for cname in collection_names:
+            if cname in properties:
+                continue
+            prefix = f"{cname}."
+            paths = [p[len(prefix) :] for p in properties if p.startswith(prefix)]
+            paths.append(self.last_updated_field)
+            # projecting both a field and one of its sub-fields is a path collision
+            projection: Dict[str, int] = {}
+            for path in sorted(paths, key=lambda p: p.count(".")):
+                if not any(path == kept or path.startswith(f"{kept}.") for kept in projection):
+                    projection[path] = 1
+            projections[cname] = projection
+        return projections
+
+    def _split_criteria(self, criteria: Optional[Dict], collection_names: List[str]) -> Tuple[Dict, Dict]:
+        """
+        Splits criteria into the predicates that only depend on the main collection
+        and the remaining ones, which need the joined documents.
 
-        if limit > 0:
-            pipeline.append({"$limit": limit})
-        return pipeline
+        Args:
+            criteria: criteria to filter by
+            collection_names: names of the joined collections
+        Returns:
+            main collection criteria and remaining criteria
+        """
+        if not criteria or self.merge_at_root:
+            # merged documents can bring in any root level field from the other collections
+            return {}, criteria or {}
+
+        main_criteria, joined_criteria = {}, {}
+        for k, v in criteria.items():
+            if self._is_main_field(k, collection_names):
+                main_criteria[k] = v
+            else:
+                joined_criteria[k] = v
+        return main_criteria, joined_criteria
+
+    def _is_main_field(self, field: str, collection_names: List[str]) -> bool:
+        """
+        Whether a field (or top level operator) only depends on the main collection,
+        for stores that do not merge at the root.
+
+        Args:
+            field: field name
+            collection_names: names of the joined collections
+        """
+        return not (
+            field == self.last_updated_field
+            or field in collection_names
+            or field.startswith(("$", *(f"{cname}." for cname in collection_names)))
+        )
 
     def count(self, criteria: Optional[Dict] = None) -> int:
         """
@@ -235,9 +480,22 @@ class JointStore(Store):
         sort: Optional[Dict[str, Union[Sort, int]]] = None,
         skip: int = 0,
         limit: int = 0,
+        batch_size: int = 1000,
     ) -> Iterator[Dict]:
-        pipeline = self._get_pipeline(criteria=criteria, properties=properties, skip=skip, limit=limit)
-        agg = self._collection.aggregate(pipeline)
+        """
+        Queries the joined collections for a set of documents.
+
+        Args:
+            criteria: PyMongo filter for documents to search in
+            properties: properties to return in grouped documents
+            sort: Dictionary of sort order for fields. Keys are field names and
+                values are 1 for ascending or -1 for descending.
+            skip: number documents to skip
+            limit: limit on total number of documents returned
+            batch_size: number of joined documents fetched per round trip
+        """
+        pipeline = self._get_pipeline(criteria=criteria, properties=properties, sort=sort, skip=skip, limit=limit)
+        agg = self._collection.aggregate(pipeline, batchSize=batch_size, allowDiskUse=True)
         yield from agg
 
     def groupby(
@@ -248,16 +506,35 @@ class JointStore(Store):
         sort: Optional[Dict[str, Union[Sort, int]]] = None,
         skip: int = 0,
         limit: int = 0,
+        batch_size: int = 1000,
     ) -> Iterator[Tuple[Dict, List[Dict]]]:
-        pipeline = self._get_pipeline(criteria=criteria, properties=properties, skip=skip, limit=limit)
+        """
+        Groups the joined documents by keys.
+
+        Args:
+            keys: fields to group documents
+            criteria: PyMongo filter for documents to search in
+            properties: properties to return in grouped documents
+            sort: Dictionary of sort order for fields. Keys are field names and
+                values are 1 for ascending or -1 for descending.
+            skip: number documents to skip
+            limit: limit on total number of documents returned
+            batch_size: number of groups fetched per round trip
+        """
+        pipeline = self._get_pipeline(criteria=criteria, properties=properties, sort=sort, skip=skip, limit=limit)
         if not isinstance(keys, list):
             keys = [keys]
         group_id = {}  # type: Dict[str,Any]
         for key in keys:
-            set_(group_id, key, f"${key}")
+            # dotted keys become nested documents in the group id
+            *parents, leaf = key.split(".")
+            sub_id = group_id
+            for parent in parents:
+                sub_id = sub_id.setdefault(parent, {})
+            sub_id[leaf] = f"${key}"
         pipeline.append({"$group": {"_id": group_id, "docs": {"$push": "$$ROOT"}}})
 
-        agg = self._collection.aggregate(pipeline)
+        agg = self._collection.aggregate(pipeline, batchSize=batch_size, allowDiskUse=True)
 
         for d in agg:
             yield d["_id"], d["docs"]
@@ -269,19 +546,20 @@ class JointStore(Store):
         Args:
             properties: properties to return in query
             criteria: filter for matching
-            kwargs: kwargs for collection.aggregate
+            kwargs: sort and skip for the query
 
         Returns:
             single document
         """
-        # TODO: maybe adding explicit limit in agg pipeline is better as below?
-        # pipeline = self._get_pipeline(properties, criteria)
-        # pipeline.append({"$limit": 1})
-        query = self.query(criteria=criteria, properties=properties, **kwargs)
-        try:
-            return next(query)
-        except StopIteration:
-            return None
+        pipeline = self._get_pipeline(
+            criteria=criteria,
+            properties=properties,
+            sort=kwargs.get("sort"),
+            skip=kwargs.get("skip", 0),
+            limit=1,
+        )
+        # a single document batch lets the server stop the joins after the first match
+        return next(iter(self._collection.aggregate(pipeline, batchSize=1, allowDiskUse=True)), None)
 
     def remove_docs(self, criteria: Dict):
         """
@@ -343,15 +621,13 @@ class ConcatStore(Store):
         Args:
             force_reset: Whether to forcibly reset the connection for all stores
         """
-        for store in self.stores:
-            store.connect(force_reset)
+        self._map(lambda store: store.connect(force_reset))
 
     def close(self):
         """
         Close all connections in this ConcatStore.
         """
-        for store in self.stores:
-            store.close()
+        self._map(lambda store: store.close())
 
     @property
     def _collection(self):
@@ -365,11 +641,21 @@ class ConcatStore(Store):
         since it could very easily over-estimate the last_updated based on what stores
         are used.
         """
-        lus = []
-        for store in self.stores:
-            lu = store.last_updated
-            lus.append(lu)
-        return max(lus)
+        return max(self._map(lambda store: store.last_updated))
+
+    def _map(self, func: Callable[[Store], Any]) -> List:
+        """
+        Applies a function to all stores concurrently, since the calls are
+        independent and usually wait on the network.
+
+        Args:
+            func: function to call with each store
+
+        Returns:
+            list of the results in the order of the stores
+        """
+        with ThreadPoolExecutor(max_workers=max(len(self.stores), 1)) as executor:
+            return list(executor.map(func, self.stores))
 
     def update(self, docs: Union[List[Dict], Dict], key: Union[List, str, None] = None):
         """
@@ -393,11 +679,11 @@ class ConcatStore(Store):
             field: the field(s) to get distinct values for
             criteria: PyMongo filter for documents to search in
         """
-        distincts = []
-        for store in self.stores:
-            distincts.extend(store.distinct(field=field, criteria=criteria))
+        distincts: Set = set()
+        for store_distincts in self._map(lambda store: store.distinct(field=field, criteria=criteria)):
+            distincts.update(store_distincts)
 
-        return list(set(distincts))
+        return list(distincts)
 
     def ensure_index(self, key: str, unique: bool = False) -> bool:
         """
@@ -410,7 +696,16 @@ class ConcatStore(Store):
         Returns:
             bool indicating if the index exists/was created on all stores
         """
-        return all(store.ensure_index(key, unique) for store in self.stores)
+        executor = ThreadPoolExecutor(max_workers=max(len(self.stores), 1))
+        futures = [executor.submit(store.ensure_index, key, unique) for store in self.stores]
+        try:
+            return all(future.result() for future in as_completed(futures))
+        finally:
+            # return without waiting on the calls still running after a failure
+            # (cancel_futures for shutdown needs python 3.9)
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
 
     def count(self, criteria: Optional[Dict] = None) -> int:
         """
@@ -419,7 +714,7 @@ class ConcatStore(Store):
         Args:
             criteria: PyMongo filter for documents to count in
         """
-        counts = [store.count(criteria) for store in self.stores]
+        counts = self._map(lambda store: store.count(criteria))
 
         return sum(counts)
 
@@ -475,29 +770,102 @@ class ConcatStore(Store):
         if isinstance(keys, str):
             keys = [keys]
 
-        docs = []
-        for store in self.stores:
-            temp_docs = list(
-                store.groupby(
-                    keys=keys,
-                    criteria=criteria,
-                    properties=properties,
-                    sort=sort,
-                    skip=skip,
-                    limit=limit,
-                )
-            )
-            for _key, group in temp_docs:
-                docs.extend(group)
+        # sort, skip and limit apply to each store's groups, which a single aggregation cannot reproduce
+        if not (sort or skip or limit or any("." in k for k in keys)):
+            collection = self._get_union_collection()
+            if collection is not None:
+                yield from self._union_groupby(collection, keys, criteria, properties)
+                return
 
         def key_set(d: Dict) -> Tuple:
             "index function based on passed in keys."
             return tuple(d.get(k, None) for k in keys)
 
-        sorted_docs = sorted(docs, key=key_set)
-        for vals, group_iter in groupby(sorted_docs, key=key_set):
-            id_dict = dict(zip(keys, vals))
-            yield id_dict, list(group_iter)
+        # groups are collected in a hash table keyed by the key values, falling back
+        # to their JSON representation for unhashable values such as lists
+        groups: Dict[Any, Tuple[Tuple, List[Dict]]] = {}
+        for store in self.stores:
+            for _key, group in store.groupby(
+                keys=keys,
+                criteria=criteria,
+                properties=properties,
+                sort=sort,
+                skip=skip,
+                limit=limit,
+            ):
+                for d in group:
+                    vals = key_set(d)
+                    group_key: Any = vals
+                    try:
+                        hash(vals)
+                    except TypeError:
+                        group_key = dumps(vals, sort_keys=True, default=str)
+                    groups.setdefault(group_key, (vals, []))[1].append(d)
+
+        for vals, docs in groups.values():
+            yield dict(zip(keys, vals)), docs
+
+    def _get_union_collection(self) -> Optional[Collection]:
+        """
+        Gets the collection of the first store if all stores are collections in the
+        same MongoDB database on a server that supports $unionWith (4.4+), so they
+        can be combined in a single aggregation.
+        """
+        if not self.stores or not all(isinstance(store, MongoStore) for store in self.stores):
+            return None
+
+        collections = [store._collection for store in self.stores]
+        database = collections[0].database
+        if not all(
+            isinstance(coll, Collection)
+            and coll.database.client is database.client
+            and coll.database.name == database.name
+            for coll in collections
+        ):
+            return None
+
+        store = self.stores[0]
+        server = (store.host, store.port) if hasattr(store, "host") else (getattr(store, "uri", None),)
+        if _get_server_version(database.client, server) < (4, 4):
+            return None
+        return collections[0]
+
+    def _union_groupby(
+        self,
+        collection: Collection,
+        keys: List[str],
+        criteria: Optional[Dict] = None,
+        properties: Union[Dict, List, None] = None,
+    ) -> Iterator[Tuple[Dict, List[Dict]]]:
+        """
+        Groups the documents of all stores on the server, using $unionWith to
+        combine the collections.
+
+        Args:
+            collection: collection of the first store
+            keys: top level fields to group documents
+            criteria: PyMongo filter for documents to search in
+            properties: properties to return in grouped documents
+        """
+        if isinstance(properties, dict):
+            properties = list(properties.keys())
+
+        pipeline: List[Dict] = []
+        if criteria:
+            pipeline.append({"$match": criteria})
+        if properties:
+            pipeline.append({"$project": dict.fromkeys(properties + keys, 1)})
+
+        union_pipeline = list(pipeline)
+        for store in self.stores[1:]:
+            union_pipeline.append({"$unionWith": {"coll": store._collection.name, "pipeline": pipeline}})
+
+        # missing fields group with null values, as they do when grouping in python
+        group_id = {f"k{i}": {"$ifNull": [f"${key}", None]} for i, key in enumerate(keys)}
+        union_pipeline.append({"$group": {"_id": group_id, "docs": {"$push": "$$ROOT"}}})
+
+        for d in collection.aggregate(union_pipeline, allowDiskUse=True):
+            yield {key: d["_id"].get(f"k{i}") for i, key in enumerate(keys)}, d["docs"]
 
     def remove_docs(self, criteria: Dict):
         """
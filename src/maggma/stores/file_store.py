@@ -8,6 +8,7 @@ import hashlib
 import os
 import re
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Callable, Dict, Iterator, List, Optional, Union
@@ -193,7 +194,7 @@ class FileStore(MemoryStore):
         - hash: str = Hash of the file contents
         - orphan: bool = Whether this record is an orphan
         """
-        file_list = []
+        file_paths = []
         # generate a list of files in subdirectories
         for root, _dirs, files in os.walk(self.path):
             # for pattern in self.file_filters:
@@ -205,9 +206,11 @@ class FileStore(MemoryStore):
                     # filter based on depth
                     depth = len(path.relative_to(self.path).parts) - 1
                     if self.max_depth is None or depth <= self.max_depth:
-                        file_list.append(self._create_record_from_file(path))
+                        file_paths.append(path)
 
-        return file_list
+        # hashing releases the GIL, so reading and hashing files in threads overlaps the I/O
+        with ThreadPoolExecutor() as executor:
+            return list(executor.map(self._create_record_from_file, file_paths))
 
     def _create_record_from_file(self, f: Path) -> Dict:
         """
@@ -236,16 +239,16 @@ class FileStore(MemoryStore):
 
         # hash the file contents
         digest2 = hashlib.md5()
-        b = bytearray(128 * 2056)
-        mv = memoryview(b)
         digest2.update(self.name.encode())
         with open(f.as_posix(), "rb", buffering=0) as file:
-            # this block copied from the file_digest method in python 3.11+
-            # see https://github.com/python/cpython/blob/0ba07b2108d4763273f3fb85544dde34c5acd40a/Lib/hashlib.py#L213
-            if hasattr(file, "getbuffer"):
-                # io.BytesIO object, use zero-copy buffer
-                digest2.update(file.getbuffer())
+            if hasattr(hashlib, "file_digest"):
+                # python 3.11+, continues the digest above with the file contents
+                hashlib.file_digest(file, lambda: digest2)
             else:
+                # this block copied from the file_digest method in python 3.11+
+                # see https://github.com/python/cpython/blob/0ba07b2108d4763273f3fb85544dde34c5acd40a/Lib/hashlib.py#L213
+                b = bytearray(128 * 2056)
+                mv = memoryview(b)
                 for n in iter(lambda: file.readinto(mv), 0):
                     digest2.update(mv[:n])
 
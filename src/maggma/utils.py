@@ -6,8 +6,9 @@ import logging
 import signal
 import uuid
 from datetime import datetime, timedelta
+from functools import lru_cache
 from importlib import import_module
-from typing import Dict, Iterable, Optional, Set, Union
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
 
 from bson.json_util import ObjectId
 from dateutil import parser
@@ -150,10 +151,102 @@ def substitute(d: Dict, aliases: Dict):
     Substitutes keys in dictionary
     Accepts multilevel mongo like keys.
     """
-    for alias, key in aliases.items():
-        if has(d, key):
-            set_(d, alias, get(d, key))
-            unset(d, key)
+    substitute_paths(d, split_aliases(aliases))
+
+
+def split_aliases(aliases: Dict) -> List[Tuple[List[str], List[str]]]:
+    """Splits the mongo like keys of an aliases dict into paths for substitute_paths."""
+    return [(alias.split("."), key.split(".")) for alias, key in aliases.items()]
+
+
+def _has_key_path(d: Dict, key: List[str]) -> bool:
+    """Whether a pre-split key path exists in a dictionary."""
+    node: Any = d
+    for i, part in enumerate(key):
+        if isinstance(node, (list, tuple)):
+            return has(node, ".".join(key[i:]))
+        if not isinstance(node, dict) or part not in node:
+            return False
+        node = node[part]
+    return True
+
+
+def _check_alias_path(d: Dict, alias: List[str]):
+    """
+    Raises a ValueError if a value that is not a container lies on the alias path,
+    rather than overwriting that value.
+    """
+    node: Any = d
+    for i, part in enumerate(alias[:-1]):
+        if part not in node:
+            return
+        node = node[part]
+        if isinstance(node, (list, tuple)):
+            return
+        if not isinstance(node, dict):
+            raise ValueError(f"Cannot substitute {'.'.join(alias)}: {'.'.join(alias[: i + 1])} is not a dictionary")
+
+
+def substitute_paths(d: Dict, alias_paths: List[Tuple[List[str], List[str]]]):
+    """
+    Substitutes keys in dictionary using pre-split alias paths from split_aliases.
+    Walks each path iteratively and skips aliases whose key is missing.
+    Raises a ValueError, before moving any key, if an alias path runs through
+    a value that is not a dictionary. Only a conflict created by moving an
+    earlier alias can be raised after the document has been changed.
+    """
+    if not isinstance(d, dict):
+        return
+
+    for alias, key in alias_paths:
+        if key[0] in d and _has_key_path(d, key):
+            _check_alias_path(d, alias)
+
+    for alias, key in alias_paths:
+        # most documents lack most aliased keys, so check the top level directly
+        if key[0] not in d:
+            continue
+
+        # collect the dicts along the key path
+        parents = [d]
+        node = d
+        for part in key[:-1]:
+            node = node.get(part)
+            if not isinstance(node, dict):
+                break
+            parents.append(node)
+
+        if isinstance(node, dict):
+            parent = parents[-1]
+            if key[-1] not in parent:
+                continue
+            _check_alias_path(d, alias)
+            value = parent.pop(key[-1])
+            # remove parents emptied by the removal
+            for part, grandparent in zip(reversed(key[:-1]), reversed(parents[:-1])):
+                if len(grandparent[part]) > 0:
+                    break
+                del grandparent[part]
+        else:
+            if isinstance(node, (list, tuple)):
+                # path goes through an array, defer to pydash for index handling
+                key_str = ".".join(key)
+                if has(d, key_str):
+                    set_(d, ".".join(alias), get(d, key_str))
+                    unset(d, key_str)
+            continue
+
+        node = d
+        for part in alias[:-1]:
+            child = node.get(part)
+            if not isinstance(child, dict):
+                if isinstance(child, (list, tuple)):
+                    set_(d, ".".join(alias), value)
+                    break
+                child = node[part] = {}  # only reached for missing keys, see _check_alias_path
+            node = child
+        else:
+            node[alias[-1]] = value
 
 
 def unset(d: Dict, key: str):
@@ -207,9 +300,11 @@ class Timeout:
             signal.alarm(0)
 
 
+@lru_cache(maxsize=None)
 def dynamic_import(abs_module_path: str, class_name: Optional[str] = None):
     """
     Dynamic class importer from: https://www.bnmetrics.com/blog/dynamic-import-in-python3.
+    Results are memoized since the same models are resolved repeatedly when loading configurations.
     """
 
     if class_name is None:
@@ -63,6 +63,13 @@ def test_sparse_query_functionality():
     assert op.query() == {"properties": ["name", "age", "weight", "last_updated"]}
 
 
+def test_sparse_query_empty_fields():
+    op = SparseFieldsQuery(model=Owner, default_fields=["name"])
+
+    assert op.query(_fields="", _all_fields=False) == {"properties": ["name"]}
+    assert op.query(_fields="age,,weight", _all_fields=False) == {"properties": ["age", "weight"]}
+
+
 def test_sparse_query_serialization():
     op = SparseFieldsQuery(model=Owner)
 
@@ -93,6 +100,30 @@ def test_numeric_query_serialization():
         assert new_op.query(age_max=10) == {"criteria": {"age": {"$lte": 10}}}
 
 
+def test_numeric_query_shared_operators():
+    op = NumericQuery(model=Owner)
+    op2 = NumericQuery(model=Owner)
+
+    assert op.query.__signature__ is op2.query.__signature__
+    assert op2.query(age_max=10) == {"criteria": {"age": {"$lte": 10}}}
+
+    op3 = NumericQuery(model=Owner, fields=["age"])
+    assert op3.query.__signature__ is not op.query.__signature__
+    assert "weight_min" not in op3.query.__signature__.parameters
+
+
+def test_numeric_query_plan():
+    op = NumericQuery(model=Owner)
+
+    assert op.query(age_min=1, weight_max=5) == {"criteria": {"age": {"$gte": 1}, "weight": {"$lte": 5}}}
+    assert op.query(age_min=2, weight_max=None) == {"criteria": {"age": {"$gte": 2}}}
+    assert op.query(age_min=3, weight_max=6) == {"criteria": {"age": {"$gte": 3}, "weight": {"$lte": 6}}}
+    assert op._query_plan.cache_info().hits == 1
+
+    with pytest.raises(KeyError):
+        op.query(height_min=1)
+
+
 def test_sort_query_functionality():
     op = SortQuery()
 
@@ -62,6 +62,19 @@ def test_msonable(owner_store):
     assert endpoint_dict["model"] == "tests.api.test_read_resource.Owner"
 
 
+def test_msonable_cached(owner_store):
+    owner_resource = ReadOnlyResource(store=owner_store, model=Owner)
+    endpoint_dict = owner_resource.as_dict()
+    endpoint_dict["model"] = "changed"
+    assert owner_resource.as_dict()["model"] == "tests.api.test_read_resource.Owner"
+
+    owner_resource.key_fields = ["name"]
+    assert owner_resource.as_dict()["key_fields"] == ["name"]
+    owner_resource.key_fields.append("age")
+    owner_resource.invalidate()
+    assert owner_resource.as_dict()["key_fields"] == ["name", "age"]
+
+
 def test_get_by_key(owner_store):
     endpoint = ReadOnlyResource(owner_store, Owner, disable_validation=True, enable_get_by_key=True)
     app = FastAPI()
@@ -86,6 +99,20 @@ def test_key_fields(owner_store):
     assert client.get("/Person1/").json()["data"][0]["name"] == "Person1"
 
 
+def test_search_batch_size(owner_store, mocker):
+    endpoint = ReadOnlyResource(owner_store, Owner)
+    app = FastAPI()
+    app.include_router(endpoint.router)
+
+    client = TestClient(app)
+    aggregate = mocker.spy(owner_store._collection, "aggregate")
+
+    res = client.get("/?_limit=5")
+    assert res.status_code == 200
+    assert len(res.json()["data"]) == 5
+    assert aggregate.call_args.kwargs["batchSize"] == 5
+
+
 @pytest.mark.xfail()
 def test_problem_query_params(owner_store):
     endpoint = ReadOnlyResource(owner_store, Owner)
@@ -216,6 +216,16 @@ def test_aliasing_query(alias_store):
     assert "f" in next(iter(alias_store.query(criteria={"f": {"$exists": 1}})))
 
 
+def test_aliasing_criteria_not_mutated(alias_store):
+    d = [{"b": 1}, {"e": 2}, {"g": {"h": 3}}]
+    alias_store.store._collection.insert_many(d)
+
+    criteria = {"a": 1}
+    assert alias_store.count(criteria) == 1
+    assert len(list(alias_store.query(criteria=criteria))) == 1
+    assert criteria == {"a": 1}
+
+
 def test_aliasing_update(alias_store):
     alias_store.update(
         [
@@ -233,6 +243,9 @@ def test_aliasing_update(alias_store):
 
     assert next(iter(alias_store.store.query(criteria={"task_id": "mp-5"})))["g"]["h"] == 6
 
+    alias_store.update({"task_id": "mp-6", "a": 7})
+    assert alias_store.store.query_one(criteria={"task_id": "mp-6"})["b"] == 7
+
 
 def test_aliasing_remove_docs(alias_store):
     alias_store.update(
@@ -280,6 +293,16 @@ def test_aliasing_distinct(alias_store):
     assert alias_store.distinct("f") == [3]
 
 
+def test_aliasing_unaliased_fields(alias_store):
+    d = [{"b": 1, "task_id": "mp-1"}, {"e": 2, "task_id": "mp-2"}]
+    alias_store.store._collection.insert_many(d)
+
+    assert sorted(alias_store.distinct("task_id")) == ["mp-1", "mp-2"]
+
+    alias_store.ensure_index("a")
+    assert "b_1" in alias_store.store._collection.index_information()
+
+
 @pytest.fixture()
 def sandbox_store():
     memstore = MemoryStore()
@@ -288,6 +311,15 @@ def sandbox_store():
     return store
 
 
+def test_sandbox_connect_index(mocker):
+    memstore = MemoryStore()
+    ensure_index = mocker.patch.object(memstore, "ensure_index", side_effect=NotImplementedError)
+    store = SandboxStore(memstore, sandbox="test")
+    store.connect()
+    store.connect()
+    ensure_index.assert_called_once_with("sbxn")
+
+
 def test_sandbox_count(sandbox_store):
     sandbox_store._collection.insert_one({"a": 1, "b": 2, "c": 3})
     assert sandbox_store.count({"a": 1}) == 1
@@ -307,6 +339,17 @@ def test_sandbox_query(sandbox_store):
     assert sandbox_store.query_one(properties=["c"], criteria={"a": 3}) is None
 
 
+def test_sandbox_query_or_criteria(sandbox_store):
+    sandbox_store._collection.insert_one({"a": 1, "b": 2})
+    sandbox_store._collection.insert_one({"a": 2, "sbxn": ["test"]})
+    sandbox_store._collection.insert_one({"a": 3, "sbxn": ["not_test"]})
+
+    criteria = {"$or": [{"a": 1}, {"a": 2}, {"a": 3}]}
+    assert {d["a"] for d in sandbox_store.query(criteria=criteria)} == {1, 2}
+    assert sandbox_store.count(criteria) == 2
+    assert "sbxn" in sandbox_store._collection.index_information()["sbxn_1"]["key"][0]
+
+
 def test_sandbox_distinct(sandbox_store):
     sandbox_store.connect()
     sandbox_store._collection.insert_one({"a": 1, "b": 2, "c": 3})
@@ -326,6 +369,8 @@ def test_sandbox_update(sandbox_store):
     assert sandbox_store._collection.find_one({"e": 6})["sbxn"] == ["test"]
     sandbox_store.update([{"e": 7, "sbxn": ["core"]}], key="e")
     assert set(sandbox_store.query_one(criteria={"e": 7})["sbxn"]) == {"test", "core"}
+    sandbox_store.update({"e": 8, "sbxn": ["core", "test"]}, key="e")
+    assert sandbox_store._collection.find_one({"e": 8})["sbxn"] == ["core", "test"]
 
 
 def test_sandbox_remove_docs(sandbox_store):
@@ -147,6 +147,14 @@ def test_multi_update(s3store, s3store_multi):
     assert time_single > time_multi * (s3store_multi.s3_workers - 1) / (s3store.s3_workers)
 
 
+def test_multi_update_shared_client(s3store_multi):
+    data = [{"task_id": f"mp-{j}", "data": j} for j in range(16)]
+    s3store_multi.update(data)
+    assert s3store_multi.s3.meta.client.meta.config.max_pool_connections >= s3store_multi.s3_workers
+    assert s3store_multi.count() == 16
+    assert s3store_multi.query_one({"task_id": "mp-7"})["data"] == 7
+
+
 def test_count(s3store):
     assert s3store.count() == 2
     assert s3store.count({"task_id": "mp-3"}) == 1
@@ -180,6 +188,36 @@ def test_update(s3store):
     assert s3store.query_one({"task_id": "mp-4"})["data"] == "asd"
 
 
+@pytest.mark.parametrize("codec", ["zlib", "zstd", "lz4"])
+def test_update_compression_codec(s3store, codec, mocker, monkeypatch):
+    pytest.importorskip({"zlib": "zlib", "zstd": "zstandard", "lz4": "lz4.frame"}[codec])
+    s3store.compress = True
+    s3store.compression_codec = codec
+    s3store.update([{"task_id": "mp-4", "data": "asd"}])
+    obj = s3store.index.query_one({"task_id": "mp-4"})
+    assert obj["compression"] == codec
+    assert s3store.query_one({"task_id": "mp-4"})["data"] == "asd"
+
+    # objects are decompressed straight from the response stream
+    monkeypatch.setattr("maggma.stores.aws.READ_CHUNK_SIZE", 7)
+    decompression = mocker.spy(s3store, "_get_decompression_function")
+    assert s3store.query_one({"task_id": "mp-4"})["data"] == "asd"
+    decompression.assert_not_called()
+
+    # objects are read back using the codec recorded in their metadata
+    s3store.compression_codec = "zlib"
+    assert s3store.query_one({"task_id": "mp-4"})["data"] == "asd"
+    s3store.index.remove_docs({})
+    s3store.rebuild_index_from_s3_data()
+    assert s3store.index.query_one({"task_id": "mp-4"})["compression"] == "zlib"
+
+
+def test_bad_compression_codec():
+    index = MemoryStore("index")
+    with pytest.raises(ValueError, match=r"Unknown compression codec.*"):
+        S3Store(index, "bucket1", compress=True, compression_codec="bz2")
+
+
 def test_rebuild_meta_from_index(s3store):
     s3store.update([{"task_id": "mp-2", "data": "asd"}])
     s3store.index.update({"task_id": "mp-2", "add_meta": "hello"})
@@ -1,10 +1,16 @@
+import os
+import threading
+import time
 from datetime import datetime
 from itertools import chain
 
+import mongomock
 import pytest
 from pydash import get
+from pymongo.collection import Collection
 
-from maggma.stores import ConcatStore, JointStore, MemoryStore, MongoStore
+from maggma.core import Sort
+from maggma.stores import ConcatStore, JointStore, MemoryStore, MongoStore, compound_stores
 
 
 @pytest.fixture()
@@ -63,6 +69,42 @@ def jointstore(jointstore_test1, jointstore_test2):
     return store
 
 
+@pytest.fixture()
+def mongoclient(mocker):
+    """
+    Patches the MongoClient used by JointStores, clearing the shared clients
+    and cached server versions afterwards.
+    """
+    client_cls = mocker.patch("maggma.stores.compound_stores.MongoClient")
+    client_cls.return_value.server_info.return_value = {"version": "4.4.0"}
+    yield client_cls
+    compound_stores._CLIENTS.clear()
+    compound_stores._SERVER_VERSION_CACHE.clear()
+
+
+@pytest.fixture()
+def mocked_jointstore(mongoclient):
+    store = JointStore("maggma_test", ["test1", "test2"])
+    store.connect()
+    yield store
+    store.close()
+
+
+def test_joint_store_indexes(jointstore, jointstore_test1, jointstore_test2):
+    assert "task_id_1" in jointstore_test1._collection.index_information()
+    assert "task_id_1" in jointstore_test2._collection.index_information()
+
+
+def test_joint_store_no_create_indexes(mongoclient, caplog):
+    collection = mongoclient.return_value.__getitem__.return_value.__getitem__.return_value
+    collection.index_information.return_value = {"_id_": {"key": [("_id", 1)]}}
+    store = JointStore("maggma_test", ["test1", "test2"], create_indexes=False)
+    store.connect()
+
+    collection.create_index.assert_not_called()
+    assert "No index on task_id" in caplog.text
+
+
 def test_joint_store_count(jointstore):
     assert jointstore.count() == 10
     assert jointstore.count({"test2.category2": {"$exists": 1}}) == 5
@@ -106,6 +148,177 @@ def test_joint_store_query_one(jointstore):
     assert doc["task_id"] == 8
 
 
+def test_joint_store_pipeline_match_pushdown():
+    store = JointStore("maggma_test", ["test1", "test2"])
+    criteria = {"my_prop": {"$gt": 3}, "test2.your_prop": {"$gt": 6}, "last_updated": {"$exists": 1}}
+
+    pipeline = store._get_pipeline(criteria=criteria, limit=1)
+    assert pipeline[0] == {"$match": {"my_prop": {"$gt": 3}}}
+    assert {"$match": {"test2.your_prop": {"$gt": 6}, "last_updated": {"$exists": 1}}} in pipeline
+    assert pipeline[-1] == {"$limit": 1}
+
+    store.merge_at_root = True
+    store._has_merge_objects = True
+    pipeline = store._get_pipeline(criteria=criteria)
+    assert "$lookup" in pipeline[0]
+    assert pipeline[-1] == {"$match": criteria}
+
+
+def test_joint_store_pipeline_lookup_projection():
+    store = JointStore("maggma_test", ["test1", "test2"])
+
+    pipeline = store._get_pipeline(properties=["task_id", "test2.your_prop"])
+    lookups = [stage["$lookup"] for stage in pipeline if "$lookup" in stage]
+    test2_lookup = next(lookup for lookup in lookups if lookup["from"] == "test2")
+    assert test2_lookup["let"] == {"key": "$task_id"}
+    assert test2_lookup["pipeline"][-1] == {"$project": {"your_prop": 1, "last_updated": 1}}
+
+    store._server_version = (5, 0, 0)
+    pipeline = store._get_pipeline(properties=["task_id", "test2.your_prop"])
+    lookups = [stage["$lookup"] for stage in pipeline if "$lookup" in stage]
+    test2_lookup = next(lookup for lookup in lookups if lookup["from"] == "test2")
+    assert test2_lookup["foreignField"] == "task_id"
+    assert test2_lookup["pipeline"] == [{"$project": {"your_prop": 1, "last_updated": 1}}]
+
+    # fields filtered or sorted on after the joins are kept
+    pipeline = store._get_pipeline(
+        criteria={"test2.your_prop": 1}, properties=["task_id"], sort={"test2.category2": 1}
+    )
+    test2_lookup = next(stage["$lookup"] for stage in pipeline if stage.get("$lookup", {}).get("from") == "test2")
+    assert test2_lookup["pipeline"] == [{"$project": {"your_prop": 1, "category2": 1, "last_updated": 1}}]
+
+    # sub-fields of projected fields are left out, as they would collide
+    pipeline = store._get_pipeline(criteria={"test2.a.b": 1}, properties=["test2.a"])
+    test2_lookup = next(stage["$lookup"] for stage in pipeline if stage.get("$lookup", {}).get("from") == "test2")
+    assert test2_lookup["pipeline"] == [{"$project": {"a": 1, "last_updated": 1}}]
+
+    # joined documents are needed whole to filter on them
+    pipeline = store._get_pipeline(criteria={"test2": {"$exists": 1}}, properties=["test2.your_prop"])
+    assert all("pipeline" not in stage["$lookup"] for stage in pipeline if "$lookup" in stage)
+
+
+def test_joint_store_nonmain_names():
+    store = JointStore("maggma_test", ["test1", "test2", "test3"], main="test2")
+    assert store.nonmain_names == ["test1", "test3"]
+
+    lookups = [stage["$lookup"]["from"] for stage in store._get_pipeline() if "$lookup" in stage]
+    assert lookups == ["test1", "test3"]
+
+    store.main = "test1"
+    lookups = [stage["$lookup"]["from"] for stage in store._get_pipeline() if "$lookup" in stage]
+    assert lookups == ["test2", "test3"]
+
+
+def test_joint_store_pipeline_join_stages():
+    store = JointStore("maggma_test", ["test1", "test2"])
+
+    pipeline = store._get_pipeline(criteria={"task_id": 1})
+    assert store._get_pipeline()[0] is pipeline[1]
+
+    store.merge_at_root = True
+    store._has_merge_objects = True
+    assert "$replaceRoot" in store._get_pipeline()[1]
+
+
+def test_joint_store_pipeline_sort():
+    store = JointStore("maggma_test", ["test1", "test2"])
+
+    pipeline = store._get_pipeline(criteria={"category": 1}, sort={"my_prop": Sort.Descending}, limit=2)
+    assert pipeline[:3] == [{"$match": {"category": 1}}, {"$sort": {"my_prop": -1}}, {"$limit": 2}]
+
+    pipeline = store._get_pipeline(sort={"my_prop": 1}, skip=1, limit=2)
+    assert pipeline[:2] == [{"$sort": {"my_prop": 1}}, {"$limit": 3}]
+    assert pipeline[-2:] == [{"$skip": 1}, {"$limit": 2}]
+
+    pipeline = store._get_pipeline(criteria={"test2.your_prop": 1}, sort={"my_prop": 1}, limit=2)
+    assert pipeline[0] == {"$sort": {"my_prop": 1}}
+    assert pipeline[-1] == {"$limit": 2}
+
+    pipeline = store._get_pipeline(sort={"test2.your_prop": 1}, limit=2)
+    assert "$lookup" in pipeline[0]
+    assert pipeline[-2:] == [{"$sort": {"test2.your_prop": 1}}, {"$limit": 2}]
+
+
+def test_joint_store_pipeline_limit_duplicate_keys():
+    db = mongomock.MongoClient()["maggma_test"]
+    db["test1"].insert_many([{"task_id": k, "last_updated": datetime.utcnow()} for k in range(3)])
+    db["test2"].insert_many([{"task_id": 0, "prop": k, "last_updated": datetime.utcnow()} for k in range(2)])
+    store = JointStore("maggma_test", ["test1", "test2"])
+
+    docs = list(db["test1"].aggregate(store._get_pipeline(sort={"task_id": 1}, limit=2)))
+    assert [(d["task_id"], d["test2"]["prop"]) for d in docs] == [(0, 0), (0, 1)]
+    docs = list(db["test1"].aggregate(store._get_pipeline(sort={"task_id": 1}, skip=1, limit=2)))
+    assert [d["task_id"] for d in docs] == [0, 1]
+
+
+def test_joint_store_server_version(mongoclient):
+    client = mongoclient.return_value
+    client.server_info.return_value = {"version": "3.10.1"}
+
+    store = JointStore("maggma_test", ["test1", "test2"])
+    store.connect()
+    assert store._has_merge_objects
+    store.connect(force_reset=True)
+    client.server_info.assert_called_once()
+
+
+def test_joint_store_shared_client(mongoclient):
+    store = JointStore("maggma_test", ["test1", "test2"])
+    other_store = JointStore("maggma_test", ["test2", "test1"])
+    store.connect()
+    other_store.connect()
+    mongoclient.assert_called_once()
+
+    store.close()
+    mongoclient.return_value.close.assert_not_called()
+    other_store.close()
+    mongoclient.return_value.close.assert_called_once()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_joint_store_clients_after_fork(mocked_jointstore):
+    pid = os.fork()
+    if pid == 0:
+        # a forked process must create its own client
+        os._exit(0 if not compound_stores._CLIENTS else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 0
+    assert compound_stores._CLIENTS
+
+
+def test_joint_store_batch_size(mocked_jointstore):
+    store = mocked_jointstore
+
+    list(store.query(batch_size=50))
+    assert store._collection.aggregate.call_args.kwargs["batchSize"] == 50
+    list(store.groupby("task_id"))
+    assert store._collection.aggregate.call_args.kwargs["batchSize"] == 1000
+
+
+def test_joint_store_query_one_limit(mocked_jointstore):
+    store = mocked_jointstore
+
+    store._collection.aggregate.return_value = iter([{"task_id": 1}, {"task_id": 2}])
+    assert store.query_one({"test2.prop": 1}) == {"task_id": 1}
+    pipeline = store._collection.aggregate.call_args.args[0]
+    assert pipeline[-1] == {"$limit": 1}
+    assert store._collection.aggregate.call_args.kwargs["batchSize"] == 1
+
+    store._collection.aggregate.return_value = iter([])
+    assert store.query_one() is None
+
+
+def test_joint_store_groupby_dotted_keys(mocked_jointstore):
+    store = mocked_jointstore
+
+    list(store.groupby(["category", "test2.category2", "test2.sub.prop"]))
+    pipeline = store._collection.aggregate.call_args.args[0]
+    assert pipeline[-1]["$group"]["_id"] == {
+        "category": "$category",
+        "test2": {"category2": "$test2.category2", "sub": {"prop": "$test2.sub.prop"}},
+    }
+
+
 @pytest.mark.xfail(reason="key grouping appears to make lists")
 def test_joint_store_distinct(jointstore):
     your_prop = jointstore.distinct("test2.your_prop")
@@ -192,11 +405,93 @@ def test_concat_store_groupby(concat_store):
     assert len(list(concat_store.groupby("task_id"))) == 40
 
 
+def test_concat_store_groupby_unhashable(concat_store):
+    concat_store.stores[0].update([{"task_id": 100, "tags": ["a", "b"]}, {"task_id": 101, "tags": ["a", "b"]}])
+    concat_store.stores[1].update([{"task_id": 102, "tags": ["a", "b"]}])
+
+    groups = {str(key["tags"]): docs for key, docs in concat_store.groupby("tags")}
+    assert len(groups["['a', 'b']"]) == 3
+
+
+def test_concat_store_union_collection(concat_store, mongoclient, mocker):
+    # memory stores each have their own client
+    assert concat_store._get_union_collection() is None
+
+    client = mongoclient.return_value
+    stores = [MongoStore("maggma_test", name, host="union-host") for name in ["test1", "test2"]]
+    for store in stores:
+        store._coll = mocker.MagicMock(spec=Collection)
+        store._coll.database.client = client
+        store._coll.database.name = "maggma_test"
+    union_store = ConcatStore(stores)
+
+    client.server_info.return_value = {"version": "4.2.0"}
+    assert union_store._get_union_collection() is None
+
+    compound_stores._SERVER_VERSION_CACHE.clear()
+    client.server_info.return_value = {"version": "4.4.0"}
+    assert union_store._get_union_collection() is stores[0]._coll
+
+    stores[1]._coll.database.name = "other_db"
+    assert union_store._get_union_collection() is None
+
+    stores[1]._coll.database.name = "maggma_test"
+    stores[1]._coll.database.client = mocker.MagicMock()
+    assert union_store._get_union_collection() is None
+
+
+def test_concat_store_groupby_union(concat_store, mocker):
+    collection = mocker.MagicMock()
+    collection.aggregate.return_value = [{"_id": {"k0": 1}, "docs": [{"task_id": 1}]}]
+    mocker.patch.object(ConcatStore, "_get_union_collection", return_value=collection)
+
+    groups = list(concat_store.groupby("task_id", criteria={"prop": "3"}, properties=["prop"]))
+    assert groups == [({"task_id": 1}, [{"task_id": 1}])]
+
+    pipeline = collection.aggregate.call_args.args[0]
+    stages = [{"$match": {"prop": "3"}}, {"$project": {"prop": 1, "task_id": 1}}]
+    assert pipeline[:2] == stages
+    assert pipeline[2] == {"$unionWith": {"coll": concat_store.stores[1]._collection.name, "pipeline": stages}}
+    assert pipeline[-1]["$group"]["_id"] == {"k0": {"$ifNull": ["$task_id", None]}}
+
+    # sort, skip and limit are applied by each store
+    union_collection = mocker.patch.object(ConcatStore, "_get_union_collection", return_value=collection)
+    collection.aggregate.reset_mock()
+    for kwargs in [{"sort": {"task_id": 1}}, {"skip": 1}, {"limit": 2}]:
+        assert list(concat_store.groupby("task_id", **kwargs))
+    union_collection.assert_not_called()
+    collection.aggregate.assert_not_called()
+
+
 def test_concat_store_count(concat_store):
     assert concat_store.count() == 40
     assert concat_store.count({"prop": "3"}) == 4
 
 
+def test_concat_store_last_updated():
+    mem_stores = [MemoryStore(str(i)) for i in range(3)]
+    store = ConcatStore(mem_stores)
+    store.connect()
+    for i, mem_store in enumerate(mem_stores):
+        mem_store.update([{"task_id": i, "last_updated": datetime(2020 + i, 1, 1)}])
+
+    assert store.last_updated == datetime(2022, 1, 1)
+
+
+def test_concat_store_ensure_index(concat_store):
+    assert concat_store.ensure_index("task_id")
+    assert all("task_id_1" in store._collection.index_information() for store in concat_store.stores)
+
+    # a failure is returned without waiting on the other stores
+    released = threading.Event()
+    concat_store.stores[0].ensure_index = lambda key, unique: False
+    concat_store.stores[1].ensure_index = lambda key, unique: released.wait(10)
+    start = time.perf_counter()
+    assert not concat_store.ensure_index("task_id")
+    assert time.perf_counter() - start < 5
+    released.set()
+
+
 def test_concat_store_query(concat_store):
     docs = list(concat_store.query(properties=["task_id"]))
     t_ids = [d["task_id"] for d in docs]
@@ -20,8 +20,8 @@ Desired behavior
 """
 
 import hashlib
+import shutil
 from datetime import datetime, timezone
-from distutils.dir_util import copy_tree
 from pathlib import Path
 
 import pytest
@@ -34,7 +34,8 @@ from maggma.stores.file_store import FileStore
 def test_dir(tmp_path):
     module_dir = Path(__file__).resolve().parent
     test_dir = module_dir / ".." / "test_files" / "file_store_test"
-    copy_tree(str(test_dir), str(tmp_path))
+    # copy the file contents only, as the tests modify the copies and their metadata
+    shutil.copytree(test_dir, tmp_path, dirs_exist_ok=True, copy_function=shutil.copyfile)
     return tmp_path.resolve()
 
 
@@ -184,7 +185,7 @@ def test_store_files_moved(test_dir):
     fs.close()
 
     # now copy the entire FileStore to a new directory and re-initialize
-    copy_tree(test_dir, str(test_dir / "new_store_location"))
+    shutil.copytree(test_dir, test_dir / "new_store_location")
     fs = FileStore(test_dir / "new_store_location", read_only=False)
     fs.connect()
     assert len(list(fs.query({"orphan": False}))) == 6
@@ -244,6 +244,11 @@ def test_memory_store_connect():
     assert isinstance(memorystore._collection, mongomock.collection.Collection)
 
 
+def test_memory_store_logger_handlers():
+    stores = [MemoryStore() for _ in range(5)]
+    assert len(stores[0].logger.handlers) == 1
+
+
 def test_groupby(memorystore):
     memorystore.update(
         [
@@ -12,6 +12,8 @@ from maggma.utils import (
     grouper,
     primed,
     recursive_update,
+    split_aliases,
+    substitute_paths,
     to_dt,
     to_isoformat_ceil_ms,
 )
@@ -75,6 +77,7 @@ def test_datetime_utils():
 
 def test_dynamic_import():
     assert dynamic_import("maggma.stores", "MongoStore").__name__ == "MongoStore"
+    assert dynamic_import("maggma.stores.MongoStore") is dynamic_import("maggma.stores", "MongoStore")
 
 
 def test_grouper():
@@ -86,3 +89,24 @@ def test_grouper():
     my_groups = list(grouper(my_iterable, 10))
     assert len(my_groups) == 11
     assert len(my_groups[10]) == 1
+
+
+def test_substitute_paths():
+    alias_paths = split_aliases({"a": "b", "c.d": "e.f", "g": "l.0"})
+
+    d = {"b": 1, "e": {"f": 2}, "l": [3, 4]}
+    substitute_paths(d, alias_paths)
+    assert d == {"a": 1, "c": {"d": 2}, "g": 3, "l": [4]}
+
+    d = {"e": {"f": 2, "k": 5}}
+    substitute_paths(d, alias_paths)
+    assert d == {"c": {"d": 2}, "e": {"k": 5}}
+
+    d = {"e": 5}
+    substitute_paths(d, alias_paths)
+    assert d == {"e": 5}
+
+    d = {"b": 1, "c": 1, "e": {"f": 2}}
+    with pytest.raises(ValueError, match="c is not a dictionary"):
+        substitute_paths(d, alias_paths)
+    assert d == {"b": 1, "c": 1, "e": {"f": 2}}